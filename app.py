@@ -1,98 +1,189 @@
 import streamlit as st
-import requests
-import json
+import httpx
+import orjson
+import hashlib
 import datetime
-import pytz # For accurate timezone handling
+import re
+from zoneinfo import ZoneInfo
+
+# Splitters for the guidance fields, compiled once at import. Stripping is
+# folded into the patterns so the per-item .strip() calls go away.
+_COMMA_SPLIT = re.compile(r"\s*,\s*")
+_SENTENCE_SPLIT = re.compile(r"\.\s+")
+
+# Resolved once at import; ZoneInfo instances are cached by the stdlib, unlike
+# pytz which re-parsed tzdata on every pytz.timezone() call.
+_IST = ZoneInfo("Asia/Kolkata")
 
 # --- Configuration ---
 # Assuming your FastAPI backend is running locally on port 8000
-BACKEND_URL = "http://localhost:8000/process_career_request/"
-
-# --- Helper Classes to structure received data (optional, but good practice) ---
-# These classes help you access data from the JSON response in an organized way.
-# They reflect the structure of your Pydantic models in crew_setup.py
-class CareerGuidanceDetails:
-    def __init__(self, data: dict):
-        self.career_path_suggestion = data.get("career_path_suggestion", "N/A")
-        self.relevant_skills_gap = data.get("relevant_skills_gap", "N/A")
-        self.actionable_steps = data.get("actionable_steps", "N/A")
-        self.potential_job_titles = data.get("potential_job_titles", [])
-
-class JobMatch:
-    def __init__(self, data: dict):
-        self.title = data.get("title", "N/A")
-        self.company = data.get("company", "N/A")
-        self.location = data.get("location", "N/A")
-        self.skills_required = data.get("skills_required", [])
-        self.description = data.get("description", "N/A")
+BACKEND_STREAM_URL = "http://localhost:8000/process_career_request_stream/"
+
+# --- Pooled HTTP client ---
+# A fresh connection per click pays a new TCP+TLS handshake every time.
+# Cache a single httpx.Client for the whole Streamlit process so keep-alive
+# connections to the backend are reused across submits and reruns. The
+# backend stack already uses httpx, so this keeps the app on one HTTP
+# library and one shared connection pool.
+@st.cache_resource
+def get_http_client() -> httpx.Client:
+    """Returns a process-wide httpx.Client with connection pooling."""
+    return httpx.Client(
+        limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+        timeout=httpx.Timeout(300.0, connect=10.0),
+    )
+
+class BackendError(Exception):
+    """Non-success outcome from the backend.
+
+    Raised instead of returned so st.cache_data never caches an error -
+    exceptions propagate uncached, letting the next submit retry rather
+    than replaying a transient failure for the full cache TTL.
+    """
+
+    def __init__(self, status_code: int, body: dict):
+        super().__init__(f"Backend returned {status_code}")
+        self.status_code = status_code
+        self.body = body
+
+
+# --- Cached backend call ---
+# Streamlit reruns the whole script on every widget interaction, so without a
+# cache the expensive LLM roundtrip would fire again on each rerun. Key the
+# cache on a sha256 of the PDF bytes plus the query string; the file object
+# itself is excluded from hashing (leading underscore) since the digest
+# already identifies its content.
+@st.cache_data(ttl=3600, show_spinner=False)
+def cached_backend_call(pdf_sha256: str, _pdf_file, user_query: str) -> dict:
+    """Posts the resume and query to the streaming backend, caching by content hash.
+
+    Consumes the backend's server-sent events so progress messages render
+    while the LLM is still generating (st.cache_data replays the emitted
+    elements on cache hits). Returns the parsed result body on success;
+    any error outcome raises BackendError so it is never cached.
+    """
+    client = get_http_client()
+
+    # Content-addressable upload: try hash-only first so repeat queries on
+    # the same resume don't re-send the PDF bytes. A 409 means the backend
+    # doesn't know this hash yet, so retry with the file attached.
+    data = {"user_query": user_query, "resume_hash": pdf_sha256}
+    with client.stream("POST", BACKEND_STREAM_URL, data=data) as response:
+        if response.status_code == 200:
+            return _consume_sse_stream(response)
+        if response.status_code != 409:
+            raise BackendError(response.status_code, orjson.loads(response.read()))
+
+    _pdf_file.seek(0)
+    files = {"resume_file": (_pdf_file.name, _pdf_file, "application/pdf")}
+    with client.stream("POST", BACKEND_STREAM_URL, files=files, data=data) as response:
+        if response.status_code != 200:
+            raise BackendError(response.status_code, orjson.loads(response.read()))
+        return _consume_sse_stream(response)
+
+
+def _consume_sse_stream(response: httpx.Response) -> dict:
+    """Reads the backend's SSE stream, rendering progress and returning the result.
+
+    Minimal SSE reader: tracks the current 'event:' name and parses each
+    'data:' line. 'progress' events render immediately; 'result' carries
+    the full payload, and 'error' (or a stream that ends without a result)
+    raises BackendError.
+    """
+    event_name = None
+    for line in response.iter_lines():
+        if not line:
+            continue
+        if line.startswith("event:"):
+            event_name = line.split(":", 1)[1].strip()
+        elif line.startswith("data:"):
+            payload = orjson.loads(line.split(":", 1)[1].strip())
+            if event_name == "progress":
+                st.info(payload.get("message", "Working..."))
+            elif event_name == "result":
+                return payload
+            elif event_name == "error":
+                raise BackendError(payload.get("status_code", 500), payload)
+    raise BackendError(500, {"detail": "Backend stream ended without a result."})
 
 # --- Function to format the output ---
 def format_career_guidance_output(guidance_data: dict, matched_jobs_data: list) -> str:
     """
     Formats the JSON guidance and job data received from the backend
     into a human-readable text string.
+
+    The payload is already validated Pydantic output from the backend, so
+    the dicts are read directly with .get() defaults rather than copied
+    into intermediate wrapper objects first.
     """
-    # Create instances of helper classes for easier access
-    guidance = CareerGuidanceDetails(guidance_data)
-    matched_jobs = [JobMatch(job) for job in matched_jobs_data]
-
-    # Get current date, time, and location dynamically
-    # Use 'Asia/Kolkata' for IST (Indian Standard Time)
-    tz = pytz.timezone('Asia/Kolkata')
-    now = datetime.datetime.now(tz)
+    career_path_suggestion = guidance_data.get("career_path_suggestion", "N/A")
+    relevant_skills_gap = guidance_data.get("relevant_skills_gap", "N/A")
+    actionable_steps = guidance_data.get("actionable_steps", "N/A")
+    potential_job_titles = guidance_data.get("potential_job_titles", [])
+
+    # Get current date, time, and location dynamically (IST)
+    now = datetime.datetime.now(_IST)
     formatted_time = now.strftime("%A, %B %d, %Y at %I:%M:%S %p %Z")
     location = "Hyderabad, Telangana, India" # Hardcoded as requested
 
-    output_text = f"**Generated on:** {formatted_time} in {location}.\n\n"
-    output_text += "---\n\n" # Separator
+    # Build the output as a list of fragments and join once at the end -
+    # repeated += on strings can re-allocate and copy on every step.
+    parts = [f"**Generated on:** {formatted_time} in {location}.\n\n"]
+    parts.append("---\n\n") # Separator
 
     # --- Career Guidance Section ---
-    output_text += "### Your Personalized Career Guidance\n\n"
-    output_text += f"**Career Path Suggestion:**\nBased on your profile, a highly suitable career path for you is **{guidance.career_path_suggestion}**. This path aligns with your current skills and offers significant opportunities for growth.\n\n"
+    parts.append("### Your Personalized Career Guidance\n\n")
+    parts.append(f"**Career Path Suggestion:**\nBased on your profile, a highly suitable career path for you is **{career_path_suggestion}**. This path aligns with your current skills and offers significant opportunities for growth.\n\n")
 
-    output_text += "**Relevant Skills Gap:**\nTo excel in the {guidance.career_path_suggestion} role and enhance your capabilities, you should focus on acquiring or improving skills in:\n"
+    parts.append(f"**Relevant Skills Gap:**\nTo excel in the {career_path_suggestion} role and enhance your capabilities, you should focus on acquiring or improving skills in:\n")
     # Assuming relevant_skills_gap might be a comma-separated string or a list.
     # If it's a string, split and format it. If it's a list, iterate directly.
-    if isinstance(guidance.relevant_skills_gap, str):
-        skills_list = [s.strip() for s in guidance.relevant_skills_gap.split(',')]
+    if isinstance(relevant_skills_gap, str):
+        skills_list = _COMMA_SPLIT.split(relevant_skills_gap.strip())
     else: # Assume it's already a list
-        skills_list = guidance.relevant_skills_gap
-    for skill in skills_list:
-        if skill: # Ensure skill is not empty
-            output_text += f"* {skill.capitalize()}\n"
-    output_text += "\n"
+        skills_list = relevant_skills_gap
+    parts.extend(f"* {skill.capitalize()}\n" for skill in skills_list if skill)
+    parts.append("\n")
 
-    output_text += "**Actionable Steps to Bridge Skills Gaps:**\nHere are detailed steps you can take to develop the identified skills:\n"
+    parts.append("**Actionable Steps to Bridge Skills Gaps:**\nHere are detailed steps you can take to develop the identified skills:\n")
     # Assuming actionable_steps might be a period-separated string.
-    if isinstance(guidance.actionable_steps, str):
-        steps_list = [s.strip() for s in guidance.actionable_steps.split('. ') if s.strip()] # Split and filter empty
+    if isinstance(actionable_steps, str):
+        steps_list = _SENTENCE_SPLIT.split(actionable_steps.strip())
     else: # Assume it's already a list of steps
-        steps_list = guidance.actionable_steps
-    for step_line in steps_list:
-        if step_line: # Ensure step is not empty
-            output_text += f"* {step_line.capitalize()}.\n" # Re-add period for clarity
-    output_text += "\n"
+        steps_list = actionable_steps
+    # Re-add the period for clarity on split sentences
+    parts.extend(f"* {step_line.strip('.').capitalize()}.\n" for step_line in steps_list if step_line)
+    parts.append("\n")
 
-    output_text += "**Potential Job Titles:**\nHere are some job titles that align well with your profile and the suggested career path:\n"
-    for title in guidance.potential_job_titles:
-        output_text += f"* {title}\n"
-    output_text += "\n"
+    parts.append("**Potential Job Titles:**\nHere are some job titles that align well with your profile and the suggested career path:\n")
+    for title in potential_job_titles:
+        parts.append(f"* {title}\n")
+    parts.append("\n")
 
-    output_text += "---\n\n" # Separator
+    parts.append("---\n\n") # Separator
 
     # --- Matched Job Opportunities Section ---
-    output_text += "### Highly Relevant Job Opportunities\n\n"
-    if matched_jobs:
-        for i, job in enumerate(matched_jobs):
-            output_text += f"* **{job.title}** at **{job.company}** ({job.location})\n"
-            output_text += f"    * **Skills Required:** {', '.join(job.skills_required)}\n"
-            output_text += f"    * **Description:** {job.description}\n"
-            if i < len(matched_jobs) - 1:
-                output_text += "\n" # Add a newline between jobs for better readability
+    parts.append("### Highly Relevant Job Opportunities\n\n")
+    if matched_jobs_data:
+        for i, job in enumerate(matched_jobs_data):
+            parts.append(f"* **{job.get('title', 'N/A')}** at **{job.get('company', 'N/A')}** ({job.get('location', 'N/A')})\n")
+            parts.append(f"    * **Skills Required:** {', '.join(job.get('skills_required', []))}\n")
+            parts.append(f"    * **Description:** {job.get('description', 'N/A')}\n")
+            if i < len(matched_jobs_data) - 1:
+                parts.append("\n") # Add a newline between jobs for better readability
     else:
-        output_text += "No relevant job opportunities found at this time.\n"
+        parts.append("No relevant job opportunities found at this time.\n")
+
+    return "".join(parts)
 
-    return output_text
+# --- Rendered output fragment ---
+# Wrapping the result block in st.fragment means interactions inside it only
+# rerun this function, not the whole script (file uploader, text area, etc.),
+# and local interactions can't accidentally re-trigger a submit.
+@st.fragment
+def render_guidance(formatted_text: str) -> None:
+    """Renders the formatted guidance markdown inside its own fragment."""
+    st.markdown(formatted_text)
 
 # --- Streamlit User Interface (UI) ---
 st.set_page_config(page_title="AI Career Assistant", layout="wide")
@@ -115,43 +206,39 @@ if st.button("Get Guidance"):
     if uploaded_file is not None:
         st.info("Processing your resume and generating guidance... This might take a moment.")
         
-        # Prepare the file and form data for the POST request
-        files = {"resume_file": ("resume.pdf", uploaded_file.getvalue(), "application/pdf")}
-        data = {"user_query": user_query}
+        # Hash the PDF once so identical (resume, query) submits and reruns
+        # are served from the Streamlit cache instead of hitting the backend.
+        pdf_sha256 = hashlib.sha256(uploaded_file.getvalue()).hexdigest()
 
         try:
-            # Make the API call to your FastAPI backend
-            response = requests.post(BACKEND_URL, files=files, data=data)
-            
-            # Check if the request was successful (HTTP status code 200)
-            if response.status_code == 200:
-                result = response.json() # Parse the JSON response
-                st.success("Guidance generated successfully!")
-                
-                # Check the 'status' field from your custom backend response
-                if result.get("status") == "success":
-                    guidance_output = result.get("crew_output", {})
-                    matched_jobs_output = result.get("matched_jobs", [])
-                    
-                    # Format the parsed data into a readable string
-                    formatted_text = format_career_guidance_output(guidance_output, matched_jobs_output)
-                    st.markdown(formatted_text) # Display the formatted text using Markdown
-                else:
-                    # If backend indicates a non-success status, show error and raw JSON for debugging
-                    st.error(f"Backend returned an error: {result.get('message', 'Unknown error')}")
-                    st.json(result)
+            # Make the API call to your FastAPI backend (cached by content hash)
+            result = cached_backend_call(pdf_sha256, uploaded_file, user_query)
+            st.success("Guidance generated successfully!")
+
+            # Check the 'status' field from your custom backend response
+            if result.get("status") == "success":
+                guidance_output = result.get("crew_output", {})
+                matched_jobs_output = result.get("matched_jobs", [])
+
+                # Format the parsed data into a readable string
+                formatted_text = format_career_guidance_output(guidance_output, matched_jobs_output)
+                render_guidance(formatted_text) # Display the formatted text in its own fragment
             else:
-                # Handle HTTP errors (e.g., 500 Internal Server Error, 400 Bad Request)
-                error_detail = response.json().get("detail", "No specific error message from backend.")
-                st.error(f"Error from backend: {response.status_code} - {error_detail}")
-                st.json(response.json()) # Display raw JSON for debugging
-        except requests.exceptions.ConnectionError:
+                # If backend indicates a non-success status, show error and raw JSON for debugging
+                st.error(f"Backend returned an error: {result.get('message', 'Unknown error')}")
+                st.json(result)
+        except BackendError as e:
+            # Handle HTTP errors (e.g., 500 Internal Server Error, 400 Bad Request).
+            # Raised (not returned) so the failure is never cached.
+            error_detail = e.body.get("detail", "No specific error message from backend.")
+            st.error(f"Error from backend: {e.status_code} - {error_detail}")
+            st.json(e.body) # Display raw JSON for debugging
+        except httpx.ConnectError:
             # Handle cases where the Streamlit app cannot connect to the FastAPI backend
             st.error("Could not connect to the backend API. Please ensure your FastAPI server is running.")
-        except json.JSONDecodeError:
+        except orjson.JSONDecodeError:
             # Handle cases where the backend response is not valid JSON
             st.error("Received an invalid response from the backend (not JSON).")
-            st.code(response.text) # Show raw text for debugging
         except Exception as e:
             # Catch any other unexpected errors during the process
             st.error(f"An unexpected error occurred: {e}")
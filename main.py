@@ -1,32 +1,97 @@
 import os
 import json
+import orjson
 import logging
 import re
-import tempfile
-import shutil
-from typing import Optional, Any, Dict, List
+import asyncio
+import hashlib
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Any, AsyncGenerator, Dict, List, Tuple
 
 from fastapi import FastAPI, UploadFile, File, Form, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel, ValidationError
 
-from crewai import Crew
-
 # Import your crew setup components
 from crew_setup import (
-    career_assistant_agent,
-    career_guidance_task,
+    build_crew,
+    build_llm,
     ResumeProcessingTool,
     JobFilteringTool,
-    FinalCrewOutput
+    CareerGuidanceDetails,
+    FinalCrewOutput,
+    SemanticCache,
+    MODEL_NAME,
+    _litellm
 )
 
+# The final output packs two independently derived halves, so they are cached
+# along that seam: guidance depends on (resume_summary, user_query) and lives
+# in the semantic cache; matched jobs depend only on the skill set and live in
+# their own map. A query tweak then invalidates only the guidance half, and a
+# job-catalog change only the jobs half.
+semantic_cache = SemanticCache()
+
+# Fallback extractors for mock-tool string output, compiled once at import.
+# re caches compiled patterns, but that cache is process-wide and capped, so
+# hot-path patterns are lifted here for deterministic reuse (and so the
+# bounded .*? in the summary pattern is auditable in one place).
+_SKILLS_RE = re.compile(r"'skills':\s*\[([^\]]+)\]")
+_SUMMARY_RE = re.compile(r"'resume_summary':\s*'(.*?)'")
+
+# Filtered job lists keyed by a hash of the sorted, lowercased skill set.
+_JOBS_CACHE: Dict[str, List[Dict[str, Any]]] = {}
+
+# The tools hold no per-request state (_run is pure with respect to the
+# instance), so one of each is constructed at import and shared by every
+# request instead of paying instantiation per call.
+_resume_tool = ResumeProcessingTool()
+_job_tool = JobFilteringTool()
+
+# Runs speculative job filtering while the resume LLM call is still
+# streaming; sized small because each task is a sub-millisecond index union.
+_SPECULATIVE_EXECUTOR = ThreadPoolExecutor(max_workers=2, thread_name_prefix="job-filter")
+
+
+def _skills_cache_key(user_skills: List[str]) -> str:
+    """Hashes the skill set order-insensitively for the jobs cache."""
+    normalized = "\n".join(sorted(s.lower() for s in user_skills))
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+# Parsed resume results keyed by sha256 of the raw PDF bytes (content-addressable
+# uploads). Clients can send only the hash on follow-up queries; a 409 tells
+# them to resend the actual bytes. Bounded LRU so memory stays flat.
+_RESUME_CACHE: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+_RESUME_CACHE_MAX = 128
+
+
+def _resume_cache_get(resume_hash: str) -> Optional[Dict[str, Any]]:
+    """Fetches a cached parsed resume and refreshes its LRU position."""
+    cached = _RESUME_CACHE.get(resume_hash)
+    if cached is not None:
+        _RESUME_CACHE.move_to_end(resume_hash)
+    return cached
+
+
+def _resume_cache_put(resume_hash: str, processed: Dict[str, Any]) -> None:
+    """Stores a parsed resume, evicting the least recently used entry if full."""
+    _RESUME_CACHE[resume_hash] = processed
+    _RESUME_CACHE.move_to_end(resume_hash)
+    while len(_RESUME_CACHE) > _RESUME_CACHE_MAX:
+        _RESUME_CACHE.popitem(last=False)
+
 # --- Configure Logging ---
+# Framework log levels are env-gated rather than hardwired to DEBUG: CrewAI and
+# LangChain at DEBUG emit multi-KB structured logs per agent step, which
+# dominates CPU on small requests. Export LOG_LEVEL=DEBUG when diagnosing LLM
+# errors; the default keeps the hot path quiet.
+LOG_LEVEL = os.getenv("LOG_LEVEL", "WARNING").upper()
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-logging.getLogger('crewai').setLevel(logging.DEBUG)
-logging.getLogger('langchain_core').setLevel(logging.DEBUG) # Crucial for LLM errors
-logging.getLogger('langchain').setLevel(logging.DEBUG) # Also helpful for broader LangChain issues
+logging.getLogger('crewai').setLevel(LOG_LEVEL)
+logging.getLogger('langchain_core').setLevel(LOG_LEVEL) # Crucial for LLM errors at DEBUG
+logging.getLogger('langchain').setLevel(LOG_LEVEL) # Also helpful for broader LangChain issues
 logging.getLogger('uvicorn.access').setLevel(logging.INFO)
 logging.getLogger('uvicorn.error').setLevel(logging.INFO)
 
@@ -52,166 +117,336 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# --- Temporary File Directory ---
-TEMP_FILES_DIR = "temp_uploads"
-os.makedirs(TEMP_FILES_DIR, exist_ok=True)
-logging.info(f"Temporary file directory set to: {TEMP_FILES_DIR}")
+@app.on_event("startup")
+async def warm_caches():
+    """
+    Warms the expensive lazy state at startup so the first real request
+    doesn't pay for it: builds the cached Crew (LLM + agent wiring), runs a
+    FinalCrewOutput validation to compile the Pydantic validators, and sends
+    a tiny completion to Groq to establish the TLS connection. Failures are
+    logged and ignored - warming is best-effort and must never block startup.
+    """
+    try:
+        # Exercise the validators once so pydantic-core is compiled and warm.
+        FinalCrewOutput.model_validate({
+            "guidance": {
+                "career_path_suggestion": "",
+                "relevant_skills_gap": "",
+                "actionable_steps": "",
+                "potential_job_titles": []
+            },
+            "matched_jobs": []
+        })
+        await asyncio.to_thread(build_crew)
+        # A 1-token ping keeps the first user from paying the TLS handshake
+        # and provider routing cold-start to api.groq.com.
+        await asyncio.to_thread(lambda: build_llm().invoke("ping"))
+        # The resume-analysis path talks to Groq through litellm's own
+        # pooled session (separate from ChatGroq's), so probe that one too.
+        await asyncio.to_thread(
+            lambda: _litellm().completion(
+                model=MODEL_NAME,
+                messages=[{"role": "user", "content": "ping"}],
+                max_tokens=1,
+            )
+        )
+        logging.info("Startup warmup complete: crew built and Groq connections primed.")
+    except Exception as e:
+        logging.warning(f"Startup warmup failed (continuing without it): {e}")
+
 
 @app.get("/")
 async def root():
     """Root endpoint for health check and welcome message."""
     return {"message": "Welcome to the AI Career Assistant API. Use /process_career_request/ to get started."}
 
-@app.post("/process_career_request/")
-async def process_career_request(
-    resume_file: UploadFile = File(..., description="The PDF resume file to upload."),
-    user_query: Optional[str] = Form("Tell me about job opportunities related to my skills and advice on career progression."),
-):
+
+async def _resolve_resume_source(
+    resume_file: Optional[UploadFile],
+    resume_hash: Optional[str],
+) -> Tuple[Optional[bytes], str]:
     """
-    Processes an uploaded resume and user query to provide career guidance and job matches.
+    Validates the upload/hash combination and returns (pdf_bytes, resume_hash).
+
+    The PDF is kept entirely in memory - a typical resume is ~100 KB, and
+    the old tempfile round-trip (write, reopen, delete) bought nothing but
+    filesystem latency and a cleanup path that could race. UploadFile.read
+    drains the upload without blocking the event loop.
+
+    Hash-only requests are accepted when the parsed resume is already cached;
+    otherwise a 409 tells the client to resend with the PDF bytes attached.
+    When a file is uploaded the hash is always computed server-side from the
+    received bytes - the client-supplied value is ignored, since trusting it
+    would let one upload poison the process-global cache under another
+    resume's key. Hashing ~100 KB costs well under a millisecond.
     """
-    pdf_path = None
-    try:
-        # Save uploaded PDF to a temporary file
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf", dir=TEMP_FILES_DIR) as tmp_file:
-            shutil.copyfileobj(resume_file.file, tmp_file)
-            pdf_path = tmp_file.name
+    if resume_file is None:
+        if not resume_hash or _resume_cache_get(resume_hash) is None:
+            raise HTTPException(
+                status_code=409,
+                detail="Unknown resume_hash. Resend the request with the PDF file attached."
+            )
+        return None, resume_hash
+
+    pdf_bytes = await resume_file.read()
+    logging.info(f"Received PDF: {resume_file.filename} ({len(pdf_bytes)} bytes).")
+    return pdf_bytes, hashlib.sha256(pdf_bytes).hexdigest()
+
+
+def _find_json_object(s: str) -> Optional[str]:
+    """
+    Returns the first balanced top-level JSON object in s, or None.
+
+    One O(n) pass with a brace counter that is string- and escape-aware,
+    replacing the old re.search(r'{.*}', s, re.DOTALL) whose greedy .*
+    backtracked over the whole output looking for the last closing brace.
+    """
+    start = s.find("{")
+    if start == -1:
+        return None
+    depth = 0
+    in_string = False
+    escaped = False
+    for i in range(start, len(s)):
+        c = s[i]
+        if in_string:
+            if escaped:
+                escaped = False
+            elif c == "\\":
+                escaped = True
+            elif c == '"':
+                in_string = False
+        elif c == '"':
+            in_string = True
+        elif c == "{":
+            depth += 1
+        elif c == "}":
+            depth -= 1
+            if depth == 0:
+                return s[start:i + 1]
+    return None
+
 
-        logging.info(f"Received PDF: {resume_file.filename} saved to {pdf_path}")
+async def _career_pipeline(
+    pdf_bytes: Optional[bytes],
+    user_query: Optional[str],
+    resume_hash: Optional[str] = None,
+) -> AsyncGenerator[Tuple[str, Any], None]:
+    """
+    Runs the resume -> jobs -> guidance pipeline, yielding ('progress', message)
+    events as each stage starts and finally ('result', payload) with the
+    response body. Both the JSON and the SSE endpoints consume this generator;
+    failures are raised as HTTPException for the caller to surface.
+
+    When resume_hash matches a previously parsed resume, the PDF stage is
+    served from the cache and pdf_bytes may be None.
+    """
+    # --- 1. Execute ResumeProcessingTool (off the event loop) ---
+    # Job filtering consumes the skills extracted here, so the two tools
+    # cannot run fully in parallel yet; awaiting them via worker threads
+    # at least keeps the event loop free for concurrent requests.
+    # Speculative job filtering: the streamed resume analysis emits its
+    # skills array well before the summary finishes, so filtering is kicked
+    # off the moment the array closes and usually completes for free inside
+    # the LLM's remaining generation time. The result is only trusted when
+    # the final skill set matches what the filter ran with.
+    speculative: Dict[str, Any] = {}
+
+    def _speculate_jobs(early_skills: List[str]) -> None:
+        # Invoked from the LLM streaming worker thread, not the event loop.
+        speculative["key"] = _skills_cache_key(early_skills)
+        speculative["future"] = _SPECULATIVE_EXECUTOR.submit(_job_tool._run, user_skills=early_skills)
 
-        # --- 1. Execute ResumeProcessingTool directly ---
+    processed_resume_data: Optional[Dict[str, Any]] = _resume_cache_get(resume_hash) if resume_hash else None
+    if processed_resume_data is not None:
+        logging.info(f"Resume cache hit for hash {resume_hash[:12]}... - skipping PDF processing.")
+    else:
+        yield ("progress", "Extracting resume content...")
         logging.info("Directly executing ResumeProcessingTool...")
-        resume_processing_tool_instance = ResumeProcessingTool()
-        processed_resume_data: Dict[str, Any] = resume_processing_tool_instance._run(pdf_path=pdf_path)
-        
-        logging.debug(f"Resume Processing Tool raw output: {processed_resume_data}")
+        processed_resume_data = await _resume_tool._arun(pdf_bytes=pdf_bytes, on_skills=_speculate_jobs)
+
+        # %s-style so the (potentially resume-sized) payload is only formatted
+        # when DEBUG is actually enabled.
+        logging.debug("Resume Processing Tool raw output: %s", processed_resume_data)
 
         # Handle potential string output from mock tool if it's not a dict
         if isinstance(processed_resume_data, str):
             try:
-                processed_resume_data = json.loads(processed_resume_data)
-            except json.JSONDecodeError:
+                processed_resume_data = orjson.loads(processed_resume_data)
+            except orjson.JSONDecodeError:
                 # Fallback for mock tool returning non-JSON string, try regex for key pieces
                 logging.warning("ResumeProcessingTool returned a string that is not valid JSON. Attempting regex extraction for mock data.")
-                skills_match = re.search(r"'skills':\s*\[([^\]]+)\]", processed_resume_data)
+                skills_match = _SKILLS_RE.search(processed_resume_data)
                 user_skills = [s.strip().strip("'\"") for s in skills_match.group(1).split(',')] if skills_match else []
-                summary_match = re.search(r"'resume_summary':\s*'(.*?)'", processed_resume_data)
+                summary_match = _SUMMARY_RE.search(processed_resume_data)
                 resume_summary = summary_match.group(1) if summary_match else "No summary extracted."
                 processed_resume_data = {"skills": user_skills, "resume_summary": resume_summary}
-        
+
         if processed_resume_data.get("status") == "error":
             raise HTTPException(status_code=400, detail=f"Resume processing failed: {processed_resume_data.get('error', 'Unknown error during PDF processing.')}")
-        
-        user_skills = processed_resume_data.get("skills", [])
-        resume_summary = processed_resume_data.get("resume_summary", "No summary extracted.")
 
-        logging.info(f"Resume processing finished. Extracted skills: {user_skills[:5]}... Summary length: {len(resume_summary)}.")
+        # Fallback-tagged results come from the keyword matcher after an LLM
+        # failure; don't pin that degraded output to the PDF hash for the
+        # rest of the process lifetime.
+        if resume_hash and processed_resume_data.get("source") != "fallback":
+            _resume_cache_put(resume_hash, processed_resume_data)
+
+    user_skills = processed_resume_data.get("skills", [])
+    resume_summary = processed_resume_data.get("resume_summary", "No summary extracted.")
 
-        # --- 2. Execute JobFilteringTool directly ---
+    logging.info("Resume processing finished. Extracted skills: %s... Summary length: %d.", user_skills[:5], len(resume_summary))
+
+    # --- 2. Execute JobFilteringTool (cached by skill set) ---
+    skills_key = _skills_cache_key(user_skills)
+    filtered_jobs_list: Optional[List[Dict[str, Any]]] = _JOBS_CACHE.get(skills_key)
+    if filtered_jobs_list is not None:
+        logging.info(f"Jobs cache hit for skill set - {len(filtered_jobs_list)} jobs.")
+    elif speculative.get("key") == skills_key:
+        # The filter already ran against the early-streamed skills while the
+        # LLM was still generating its summary; adopt that result.
+        filtered_jobs_list = await asyncio.wrap_future(speculative["future"])
+        _JOBS_CACHE[skills_key] = filtered_jobs_list
+        logging.info(f"Speculative job filtering adopted - {len(filtered_jobs_list)} jobs.")
+    else:
+        yield ("progress", "Filtering job opportunities...")
         logging.info("Directly executing JobFilteringTool...")
-        job_filtering_tool_instance = JobFilteringTool()
-        filtered_jobs_list: List[Dict[str, Any]] = job_filtering_tool_instance._run(user_skills=user_skills)
-        
+        filtered_jobs_list = await _job_tool._arun(user_skills=user_skills)
+        _JOBS_CACHE[skills_key] = filtered_jobs_list
         logging.info(f"Job filtering finished. Found {len(filtered_jobs_list)} jobs.")
 
-        # --- 3. Run Career Guidance Task using CrewAI ---
-        combined_context_for_llm = {
-            "resume_summary": resume_summary,
-            "user_extracted_skills": user_skills,
-            "user_query": user_query,
-            "filtered_jobs_list": filtered_jobs_list
-        }
-        combined_context_str = json.dumps(combined_context_for_llm, indent=2)
-
-        career_guidance_crew = Crew(
-            agents=[career_assistant_agent],
-            tasks=[career_guidance_task],
-            verbose=True,
-            output_pydantic=FinalCrewOutput # Instruct CrewAI for Pydantic output
+    # --- 3. Run Career Guidance Task using CrewAI ---
+    combined_context_for_llm = {
+        "resume_summary": resume_summary,
+        "user_extracted_skills": user_skills,
+        "user_query": user_query,
+        "filtered_jobs_list": filtered_jobs_list
+    }
+    combined_context_str = orjson.dumps(combined_context_for_llm, option=orjson.OPT_INDENT_2).decode()
+
+    # --- Semantic cache lookup: skip the LLM entirely on a hit ---
+    # Only the guidance half is cached here; matched jobs come from the jobs
+    # cache above, so a fresh job catalog is stitched in even on a hit.
+    # The semantic tier runs the sentence-transformers encoder; keep it off
+    # the event loop like the tools.
+    cached_guidance = await asyncio.to_thread(semantic_cache.get, resume_summary, user_query)
+    if cached_guidance is not None:
+        logging.info("Semantic cache hit - returning cached career guidance.")
+        validated_guidance = CareerGuidanceDetails.model_validate(cached_guidance)
+        yield ("result", {
+            "status": "success",
+            "message": "Career guidance generated successfully (cached).",
+            "crew_output": validated_guidance.model_dump(),
+            "matched_jobs": filtered_jobs_list
+        })
+        return
+
+    # The Crew (LLM, agent, task wiring) is built once per process and
+    # cached; repeated requests reuse the same instance.
+    career_guidance_crew = build_crew()
+
+    yield ("progress", "Generating career guidance...")
+    logging.info("Starting career guidance generation with CrewAI...")
+
+    crew_raw_output_from_kickoff: Any
+    try:
+        # CrewAI's kickoff can return the Pydantic object directly if successful,
+        # or a RawOutput (which has a .raw string attribute), or sometimes just a string.
+        crew_raw_output_from_kickoff = career_guidance_crew.kickoff(
+            inputs={
+                'context_for_guidance': combined_context_str,
+            }
+        )
+        logging.info("Career guidance generation finished successfully.")
+    except Exception as e:
+        logging.error(f"CrewAI kickoff failed: {e}", exc_info=True)
+        raise HTTPException(
+            status_code=500,
+            detail=f"CrewAI execution failed: {e}. Check server logs for detailed LLM errors."
         )
-        
-        logging.info("Starting career guidance generation with CrewAI...")
-        
-        crew_raw_output_from_kickoff: Any
-        try:
-            # CrewAI's kickoff can return the Pydantic object directly if successful,
-            # or a RawOutput (which has a .raw string attribute), or sometimes just a string.
-            crew_raw_output_from_kickoff = career_guidance_crew.kickoff(
-                inputs={
-                    'context_for_guidance': combined_context_str,
-                }
-            )
-            logging.info("Career guidance generation finished successfully.")
-        except Exception as e:
-            logging.error(f"CrewAI kickoff failed: {e}", exc_info=True)
-            raise HTTPException(
-                status_code=500,
-                detail=f"CrewAI execution failed: {e}. Check server logs for detailed LLM errors."
-            )
 
-        final_pydantic_result: Optional[FinalCrewOutput] = None
-        full_string_output: str = ""
-        
-        # Determine the raw string output from CrewAI's kickoff
-        if isinstance(crew_raw_output_from_kickoff, str):
-            full_string_output = crew_raw_output_from_kickoff
-        elif hasattr(crew_raw_output_from_kickoff, 'raw') and isinstance(crew_raw_output_from_kickoff.raw, str):
-            full_string_output = crew_raw_output_from_kickoff.raw
-        elif isinstance(crew_raw_output_from_kickoff, FinalCrewOutput):
-            # If it's already the Pydantic object, no string parsing needed
-            final_pydantic_result = crew_raw_output_from_kickoff
-            logging.debug("CrewAI kickoff returned FinalCrewOutput directly.")
-        else:
-            # Fallback for unexpected types
-            full_string_output = str(crew_raw_output_from_kickoff)
-            logging.warning(f"CrewAI kickoff returned unexpected type: {type(crew_raw_output_from_kickoff)}. Attempting string conversion.")
-
-        # Attempt to parse the string output into the Pydantic model, if not already a Pydantic object
-        if not final_pydantic_result and full_string_output:
-            # Use regex to find the outermost JSON object in the string
-            # This regex looks for a string that starts with '{' and ends with '}'
-            # and is as short as possible (non-greedy) but still captures the whole JSON.
-            # re.DOTALL ensures '.' matches newlines as well.
-            json_match = re.search(r'{.*}', full_string_output.strip(), re.DOTALL)
-            
-            if json_match:
-                extracted_json_string = json_match.group(0)
-                logging.debug(f"Successfully extracted potential JSON string (first 200 chars): {extracted_json_string[:200]}...")
-                
-                try:
-                    # Attempt to parse the extracted JSON string with Pydantic
-                    final_pydantic_result = FinalCrewOutput.model_validate_json(extracted_json_string)
-                    logging.info("Successfully parsed extracted JSON string to FinalCrewOutput.")
-                except (json.JSONDecodeError, ValidationError) as e:
-                    logging.error(f"Failed to parse extracted JSON string as FinalCrewOutput (JSON or Pydantic error): {e}. Extracted string: '{extracted_json_string}'", exc_info=True)
-                    raise HTTPException(
-                        status_code=500,
-                        detail=f"CrewAI output parsing error: Extracted content was not valid for FinalCrewOutput. Raw output: {extracted_json_string}"
-                    )
-            else:
-                logging.error(f"Could not extract a JSON object from the CrewAI output string. Full raw output: '{full_string_output}'")
+    final_pydantic_result: Optional[FinalCrewOutput] = None
+    full_string_output: str = ""
+
+    # Determine the raw string output from CrewAI's kickoff
+    if isinstance(crew_raw_output_from_kickoff, str):
+        full_string_output = crew_raw_output_from_kickoff
+    elif hasattr(crew_raw_output_from_kickoff, 'raw') and isinstance(crew_raw_output_from_kickoff.raw, str):
+        full_string_output = crew_raw_output_from_kickoff.raw
+    elif isinstance(crew_raw_output_from_kickoff, FinalCrewOutput):
+        # If it's already the Pydantic object, no string parsing needed
+        final_pydantic_result = crew_raw_output_from_kickoff
+        logging.debug("CrewAI kickoff returned FinalCrewOutput directly.")
+    else:
+        # Fallback for unexpected types
+        full_string_output = str(crew_raw_output_from_kickoff)
+        logging.warning(f"CrewAI kickoff returned unexpected type: {type(crew_raw_output_from_kickoff)}. Attempting string conversion.")
+
+    # Attempt to parse the string output into the Pydantic model, if not already a Pydantic object
+    if not final_pydantic_result and full_string_output:
+        # Find the first balanced JSON object in the output with a single
+        # linear scan; the LLM may wrap it in preamble/epilogue text.
+        extracted_json_string = _find_json_object(full_string_output.strip())
+
+        if extracted_json_string is not None:
+            logging.debug("Successfully extracted potential JSON string (first 200 chars): %.200s...", extracted_json_string)
+
+            try:
+                # Attempt to parse the extracted JSON string with Pydantic
+                final_pydantic_result = FinalCrewOutput.model_validate_json(extracted_json_string)
+                logging.info("Successfully parsed extracted JSON string to FinalCrewOutput.")
+            except (json.JSONDecodeError, ValidationError) as e:
+                logging.error(f"Failed to parse extracted JSON string as FinalCrewOutput (JSON or Pydantic error): {e}. Extracted string: '{extracted_json_string}'", exc_info=True)
                 raise HTTPException(
                     status_code=500,
-                    detail=f"CrewAI output format error: The AI did not produce a recognizable JSON output. Raw output: {full_string_output}"
+                    detail=f"CrewAI output parsing error: Extracted content was not valid for FinalCrewOutput. Raw output: {extracted_json_string}"
                 )
-        
-        # Final check: If after all attempts, final_pydantic_result is still not a FinalCrewOutput instance
-        if not isinstance(final_pydantic_result, FinalCrewOutput):
-            error_content = full_string_output if full_string_output else str(crew_raw_output_from_kickoff)
-            logging.error(f"Final object is not FinalCrewOutput after all parsing attempts. Actual type: {type(final_pydantic_result)}. Content: {error_content}")
+        else:
+            logging.error(f"Could not extract a JSON object from the CrewAI output string. Full raw output: '{full_string_output}'")
             raise HTTPException(
                 status_code=500,
-                detail=f"CrewAI output format error: Final result is not a FinalCrewOutput instance. This indicates a deeper issue. Raw initial output: {error_content}"
+                detail=f"CrewAI output format error: The AI did not produce a recognizable JSON output. Raw output: {full_string_output}"
             )
-        
-        # Now, `final_pydantic_result` is guaranteed to be a FinalCrewOutput instance
-        return JSONResponse(content={
-            "status": "success",
-            "message": "Career guidance generated successfully.",
-            # Ensure model_dump() is used for nested Pydantic models when converting to dict
-            "crew_output": final_pydantic_result.guidance.model_dump(),
-            "matched_jobs": [job.model_dump() for job in final_pydantic_result.matched_jobs]
-        })
+
+    # Final check: If after all attempts, final_pydantic_result is still not a FinalCrewOutput instance
+    if not isinstance(final_pydantic_result, FinalCrewOutput):
+        error_content = full_string_output if full_string_output else str(crew_raw_output_from_kickoff)
+        logging.error(f"Final object is not FinalCrewOutput after all parsing attempts. Actual type: {type(final_pydantic_result)}. Content: {error_content}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"CrewAI output format error: Final result is not a FinalCrewOutput instance. This indicates a deeper issue. Raw initial output: {error_content}"
+        )
+
+    # Now, `final_pydantic_result` is guaranteed to be a FinalCrewOutput instance
+    await asyncio.to_thread(
+        semantic_cache.put, resume_summary, user_query, final_pydantic_result.guidance.model_dump()
+    )
+    yield ("result", {
+        "status": "success",
+        "message": "Career guidance generated successfully.",
+        # Ensure model_dump() is used for nested Pydantic models when converting to dict
+        "crew_output": final_pydantic_result.guidance.model_dump(),
+        "matched_jobs": [job.model_dump() for job in final_pydantic_result.matched_jobs]
+    })
+
+
+@app.post("/process_career_request/")
+async def process_career_request(
+    resume_file: Optional[UploadFile] = File(None, description="The PDF resume file to upload. Optional when resume_hash is known to the server."),
+    user_query: Optional[str] = Form("Tell me about job opportunities related to my skills and advice on career progression."),
+    resume_hash: Optional[str] = Form(None, description="sha256 of the PDF bytes; lets repeat queries skip re-uploading the file."),
+):
+    """
+    Processes an uploaded resume and user query to provide career guidance and job matches.
+    """
+    try:
+        pdf_bytes, resume_hash = await _resolve_resume_source(resume_file, resume_hash)
+
+        async for kind, payload in _career_pipeline(pdf_bytes, user_query, resume_hash):
+            if kind == "result":
+                return JSONResponse(content=payload)
+
+        # The pipeline always ends with a result event; reaching here means it didn't.
+        raise HTTPException(status_code=500, detail="Internal server error: pipeline produced no result.")
 
     except HTTPException as e:
         logging.error(f"HTTPException caught: {e.detail}", exc_info=True)
@@ -222,11 +457,40 @@ async def process_career_request(
             status_code=500,
             detail=f"Internal server error: {e}. Please check server logs for details."
         )
-    finally:
-        # Ensure temporary PDF file is cleaned up
-        if pdf_path and os.path.exists(pdf_path):
-            try:
-                os.remove(pdf_path)
-                logging.info(f"Cleaned up temporary file: {pdf_path}")
-            except Exception as e:
-                logging.error(f"Failed to delete temporary file {pdf_path}: {e}")
\ No newline at end of file
+
+
+def _sse_event(event: str, data: Any) -> str:
+    """Formats a single server-sent event."""
+    return f"event: {event}\ndata: {orjson.dumps(data).decode()}\n\n"
+
+
+@app.post("/process_career_request_stream/")
+async def process_career_request_stream(
+    resume_file: Optional[UploadFile] = File(None, description="The PDF resume file to upload. Optional when resume_hash is known to the server."),
+    user_query: Optional[str] = Form("Tell me about job opportunities related to my skills and advice on career progression."),
+    resume_hash: Optional[str] = Form(None, description="sha256 of the PDF bytes; lets repeat queries skip re-uploading the file."),
+):
+    """
+    Streaming variant of /process_career_request/: emits server-sent events
+    ('progress' per pipeline stage, then 'result' with the full payload, or
+    'error' on failure) so clients can render progress instead of blocking
+    on the full generation. The guidance itself is a single structured JSON
+    object, so it is buffered and sent whole in the final 'result' event.
+    """
+    pdf_bytes, resume_hash = await _resolve_resume_source(resume_file, resume_hash)
+
+    async def event_stream() -> AsyncGenerator[str, None]:
+        try:
+            async for kind, payload in _career_pipeline(pdf_bytes, user_query, resume_hash):
+                if kind == "progress":
+                    yield _sse_event("progress", {"message": payload})
+                else:
+                    yield _sse_event("result", payload)
+        except HTTPException as e:
+            logging.error(f"HTTPException during streaming request: {e.detail}", exc_info=True)
+            yield _sse_event("error", {"status_code": e.status_code, "detail": e.detail})
+        except Exception as e:
+            logging.exception(f"An unexpected error occurred during streaming career request: {e}")
+            yield _sse_event("error", {"status_code": 500, "detail": f"Internal server error: {e}."})
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream")